@@ -1,4 +1,4 @@
-use chrono::{DateTime, Utc};
+use chrono::Utc;
 use discord_rich_presence::{
     activity::{Activity, Assets, Button, Timestamps},
     DiscordIpc, DiscordIpcClient,
@@ -7,11 +7,12 @@ use std::{thread::sleep, time::Duration};
 
 use crate::{
     trakt::{Trakt, TraktWatchingResponse},
-    utils::log,
+    utils::{log, rfc3339_to_timestamp},
 };
 
 pub struct Discord {
     client: DiscordIpcClient,
+    connected: bool,
 }
 
 impl Discord {
@@ -20,16 +21,18 @@ impl Discord {
             client: match DiscordIpcClient::new(&discord_client_id) {
                 Ok(client) => client,
                 Err(e) => {
-                    log(&format!("Couldn't connect to Discord: {e}"));
+                    log(format_args!("Couldn't connect to Discord: {e}"));
                     panic!("Couldn't connect to Discord");
                 }
             },
+            connected: false,
         }
     }
 
     pub fn connect(&mut self) {
         loop {
             if self.client.connect().is_ok() {
+                self.connected = true;
                 break;
             } else {
                 log("Failed to connect to Discord, retrying in 15 seconds");
@@ -39,7 +42,12 @@ impl Discord {
     }
 
     pub fn close(&mut self) {
+        // the activity is already cleared, no need to reset it again on every idle poll
+        if !self.connected {
+            return;
+        }
         self.client.close().unwrap();
+        self.connected = false;
     }
 
     pub fn set_activity(&mut self, trakt_response: &TraktWatchingResponse, trakt: &mut Trakt) {
@@ -48,12 +56,20 @@ impl Discord {
         let media;
         let link_imdb;
         let link_trakt;
-        let start_date = DateTime::parse_from_rfc3339(&trakt_response.started_at).unwrap();
-        let end_date = DateTime::parse_from_rfc3339(&trakt_response.expires_at).unwrap();
-        let now = Utc::now();
-        let percentage = now.signed_duration_since(start_date).num_seconds() as f32
-            / end_date.signed_duration_since(start_date).num_seconds() as f32;
-        let watch_percentage = format!("{:.2}%", percentage * 100.0);
+        let (start_timestamp, end_timestamp) = match (
+            rfc3339_to_timestamp(&trakt_response.started_at),
+            rfc3339_to_timestamp(&trakt_response.expires_at),
+        ) {
+            (Some(start_timestamp), Some(end_timestamp)) => (start_timestamp, end_timestamp),
+            _ => {
+                log("Couldn't parse the Trakt watch timestamps");
+                return;
+            }
+        };
+        let now = Utc::now().timestamp();
+        let percentage =
+            100.0 * (now - start_timestamp) as f32 / (end_timestamp - start_timestamp) as f32;
+        let watch_percentage = format!("{percentage:.2}%");
 
         match trakt_response.r#type.as_str() {
             "movie" => {
@@ -71,8 +87,7 @@ impl Discord {
                     movie.ids.imdb.as_ref().unwrap()
                 );
                 link_trakt = format!(
-                    "https://trakt.tv/{}/{}",
-                    media,
+                    "https://trakt.tv/{media}/{}",
                     movie.ids.slug.as_ref().unwrap()
                 );
             }
@@ -87,18 +102,20 @@ impl Discord {
                     show.ids.imdb.as_ref().unwrap()
                 );
                 link_trakt = format!(
-                    "https://trakt.tv/{}/{}",
-                    media,
+                    "https://trakt.tv/{media}/{}",
                     show.ids.slug.as_ref().unwrap()
                 );
             }
             _ => {
-                log(&format!("Unknown media type: {}", trakt_response.r#type));
+                log(format_args!(
+                    "Unknown media type: {}",
+                    trakt_response.r#type
+                ));
                 return;
             }
         }
 
-        log(&format!("{details} - {state} | {watch_percentage}"));
+        log(format_args!("{details} - {state} | {watch_percentage}"));
 
         let payload = Activity::new()
             .details(&details)
@@ -110,16 +127,18 @@ impl Discord {
                     .small_image("trakt")
                     .small_text("Discrakt"),
             )
-            .timestamps(
-                Timestamps::new()
-                    .start(start_date.timestamp())
-                    .end(end_date.timestamp()),
-            )
+            .timestamps(Timestamps::new().start(start_timestamp).end(end_timestamp))
             .buttons(vec![
                 Button::new("IMDB", &link_imdb),
                 Button::new("Trakt", &link_trakt),
             ]);
 
+        // reconnect right away after an idle period so the activity shows up on this poll
+        // instead of failing once and only appearing on the next one
+        if !self.connected {
+            self.connect();
+        }
+
         if self.client.set_activity(payload).is_err() {
             self.connect();
         }
@@ -3,7 +3,10 @@ use discrakt::{
     trakt::Trakt,
     utils::{load_config, log},
 };
-use std::{thread::sleep, time::Duration};
+use std::{
+    thread::sleep,
+    time::{Duration, Instant},
+};
 
 fn main() -> Result<(), Box<dyn std::error::Error>> {
     let cfg = load_config();
@@ -12,18 +15,18 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
     Discord::connect(&mut discord);
 
     loop {
-        sleep(Duration::from_secs(15));
+        let poll_start = Instant::now();
 
-        let response = match Trakt::get_watching(&trakt) {
-            Some(response) => response,
+        match Trakt::get_watching(&mut trakt) {
+            Some(response) => Discord::set_activity(&mut discord, &response, &mut trakt),
             None => {
                 log("Nothing is being played");
                 // resets the connection to also reset the activity
                 Discord::close(&mut discord);
-                continue;
             }
-        };
+        }
 
-        Discord::set_activity(&mut discord, &response, &mut trakt);
+        // keep a steady cadence regardless of how long the requests took
+        sleep(Duration::from_secs(15).saturating_sub(poll_start.elapsed()));
     }
 }
@@ -1,22 +1,24 @@
 use serde::Deserialize;
 use std::{collections::HashMap, time::Duration};
-use ureq::{Agent, AgentBuilder};
+use ureq::{Agent, AgentBuilder, Request};
 
-#[derive(Deserialize)]
+use crate::utils::log;
+
+#[derive(Clone, Deserialize)]
 pub struct TraktMovie {
     pub title: String,
     pub year: u16,
     pub ids: TraktIds,
 }
 
-#[derive(Deserialize)]
+#[derive(Clone, Deserialize)]
 pub struct TraktShow {
     pub title: String,
     pub year: u16,
     pub ids: TraktIds,
 }
 
-#[derive(Deserialize)]
+#[derive(Clone, Deserialize)]
 pub struct TraktEpisode {
     pub season: u8,
     pub number: u8,
@@ -24,7 +26,7 @@ pub struct TraktEpisode {
     pub ids: TraktIds,
 }
 
-#[derive(Deserialize)]
+#[derive(Clone, Deserialize)]
 pub struct TraktIds {
     pub trakt: u32,
     pub slug: Option<String>,
@@ -34,7 +36,7 @@ pub struct TraktIds {
     pub tvrage: Option<u32>,
 }
 
-#[derive(Deserialize)]
+#[derive(Clone, Deserialize)]
 pub struct TraktWatchingResponse {
     pub expires_at: String,
     pub started_at: String,
@@ -56,7 +58,10 @@ pub struct Trakt {
     cache: HashMap<String, f64>,
     agent: Agent,
     client_id: String,
-    username: String,
+    watching_endpoint: String,
+    watching: Option<TraktWatchingResponse>,
+    watching_etag: Option<String>,
+    watching_last_modified: Option<String>,
 }
 
 impl Trakt {
@@ -68,56 +73,108 @@ impl Trakt {
                 .timeout_write(Duration::from_secs(5))
                 .build(),
             client_id,
-            username,
+            watching_endpoint: format!("https://api.trakt.tv/users/{username}/watching"),
+            watching: None,
+            watching_etag: None,
+            watching_last_modified: None,
         }
     }
 
-    pub fn get_watching(&self) -> Option<TraktWatchingResponse> {
-        let endpoint = format!("https://api.trakt.tv/users/{}/watching", self.username);
-
-        let response = match self
-            .agent
-            .get(&endpoint)
+    fn request(&self, endpoint: &str) -> Request {
+        self.agent
+            .get(endpoint)
             .set("Content-Type", "application/json")
             .set("trakt-api-version", "2")
             .set("trakt-api-key", &self.client_id)
-            .call()
-        {
+    }
+
+    pub fn get_watching(&mut self) -> Option<TraktWatchingResponse> {
+        let mut request = self.request(&self.watching_endpoint);
+        if let Some(etag) = &self.watching_etag {
+            request = request.set("If-None-Match", etag);
+        }
+        if let Some(last_modified) = &self.watching_last_modified {
+            request = request.set("If-Modified-Since", last_modified);
+        }
+
+        let response = match request.call() {
             Ok(response) => response,
-            Err(_) => return None,
+            Err(e) => {
+                log(format_args!("Couldn't get what is being watched: {e}"));
+                return None;
+            }
         };
 
-        match response.into_json() {
+        let status = response.status();
+        let etag = response.header("ETag").map(str::to_string);
+        let last_modified = response.header("Last-Modified").map(str::to_string);
+
+        // 204 (nothing playing) and 304 (unchanged) bodies are empty, but they are still
+        // read so that the connection is handed back to the pool
+        let body = match response.into_string() {
             Ok(body) => body,
-            Err(_) => None,
+            Err(e) => {
+                log(format_args!("Couldn't read what is being watched: {e}"));
+                return None;
+            }
+        };
+
+        match status {
+            304 => return self.watching.clone(),
+            204 => self.watching = None,
+            _ => match serde_json::from_str(&body) {
+                Ok(watching) => self.watching = watching,
+                Err(e) => {
+                    log(format_args!("Couldn't parse what is being watched: {e}"));
+                    // don't let a 304 replay a body we couldn't read, the next poll is unconditional
+                    self.watching = None;
+                    self.watching_etag = None;
+                    self.watching_last_modified = None;
+                    return None;
+                }
+            },
         }
+        self.watching_etag = etag;
+        self.watching_last_modified = last_modified;
+
+        self.watching.clone()
     }
 
     pub fn get_movie_rating(&mut self, movie_slug: String) -> Option<f64> {
         match self.cache.get(&movie_slug) {
             Some(rating) => Some(*rating),
             None => {
-                let endpoint = format!("https://api.trakt.tv/movies/{}/ratings", movie_slug);
-
-                let response = match self
-                    .agent
-                    .get(&endpoint)
-                    .set("Content-Type", "application/json")
-                    .set("trakt-api-version", "2")
-                    .set("trakt-api-key", &self.client_id)
-                    .call()
-                {
+                let endpoint = format!("https://api.trakt.tv/movies/{movie_slug}/ratings");
+
+                let response = match self.request(&endpoint).call() {
                     Ok(response) => response,
-                    Err(_) => return Some(0.0),
+                    Err(e) => {
+                        log(format_args!("Couldn't get the rating of {movie_slug}: {e}"));
+                        return Some(0.0);
+                    }
+                };
+
+                let body = match response.into_string() {
+                    Ok(body) => body,
+                    Err(e) => {
+                        log(format_args!(
+                            "Couldn't read the rating of {movie_slug}: {e}"
+                        ));
+                        return Some(0.0);
+                    }
                 };
 
-                match response.into_json() {
+                match serde_json::from_str::<TraktRatingsResponse>(&body) {
                     Ok(body) => {
-                        let body: TraktRatingsResponse = body;
                         self.cache.insert(movie_slug.to_string(), body.rating);
                         Some(body.rating)
                     }
-                    Err(_) => Some(0.0),
+                    Err(e) => {
+                        log(format_args!(
+                            "Couldn't parse the rating of {movie_slug}: {e}"
+                        ));
+                        Some(0.0)
+                    }
                 }
             }
         }
@@ -1,5 +1,6 @@
-use chrono::{SecondsFormat, Utc};
+use chrono::{DateTime, FixedOffset, NaiveDate, SecondsFormat, TimeZone, Utc};
 use configparser::ini::Ini;
+use std::fmt::Display;
 
 pub struct Env {
     pub discord_token: String,
@@ -24,10 +25,104 @@ pub fn load_config() -> Env {
     }
 }
 
-pub fn log(message: &str) {
+pub fn log(message: impl Display) {
     println!(
         "{} : {}",
         Utc::now().to_rfc3339_opts(SecondsFormat::Secs, true),
         message
     );
 }
+
+pub fn parse_rfc3339(timestamp: &str) -> Option<DateTime<FixedOffset>> {
+    // Trakt sends strict RFC 3339, so only fall back to the lenient parser when that fails
+    DateTime::parse_from_rfc3339(timestamp)
+        .or_else(|_| timestamp.parse())
+        .ok()
+}
+
+pub fn rfc3339_to_timestamp(timestamp: &str) -> Option<i64> {
+    utc_to_timestamp(timestamp).or_else(|| parse_rfc3339(timestamp).map(|date| date.timestamp()))
+}
+
+// fast path for the UTC timestamps Trakt sends (e.g. 2022-05-01T20:15:00.000Z),
+// which are sliced into their fields instead of going through the chrono parser
+fn utc_to_timestamp(timestamp: &str) -> Option<i64> {
+    let bytes = timestamp.as_bytes();
+    if bytes.len() < 20
+        || bytes[4] != b'-'
+        || bytes[7] != b'-'
+        || bytes[10] != b'T'
+        || bytes[13] != b':'
+        || bytes[16] != b':'
+        || bytes[bytes.len() - 1] != b'Z'
+    {
+        return None;
+    }
+
+    let fraction = &bytes[19..bytes.len() - 1];
+    if !fraction.is_empty()
+        && (fraction.len() < 2
+            || fraction[0] != b'.'
+            || !fraction[1..].iter().all(u8::is_ascii_digit))
+    {
+        return None;
+    }
+
+    let field = |start: usize, end: usize| {
+        let digits = timestamp.get(start..end)?;
+        if !digits.bytes().all(|digit| digit.is_ascii_digit()) {
+            return None;
+        }
+        digits.parse::<u32>().ok()
+    };
+
+    NaiveDate::from_ymd_opt(field(0, 4)? as i32, field(5, 7)?, field(8, 10)?)?
+        .and_hms_opt(field(11, 13)?, field(14, 16)?, field(17, 19)?)
+        .map(|date| Utc.from_utc_datetime(&date).timestamp())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn chrono_timestamp(timestamp: &str) -> Option<i64> {
+        DateTime::parse_from_rfc3339(timestamp)
+            .ok()
+            .map(|date| date.timestamp())
+    }
+
+    #[test]
+    fn utc_fast_path_matches_chrono() {
+        for timestamp in [
+            "2022-05-01T20:15:00.000Z",
+            "2022-05-01T20:15:00Z",
+            "2022-05-01T20:15:00.123456789Z",
+            "1969-07-20T20:17:40.000Z",
+        ] {
+            assert!(utc_to_timestamp(timestamp).is_some(), "{timestamp}");
+            assert_eq!(utc_to_timestamp(timestamp), chrono_timestamp(timestamp));
+        }
+    }
+
+    #[test]
+    fn falls_back_to_chrono() {
+        for timestamp in ["2016-12-31T23:59:60Z", "2022-05-01T20:15:00+01:00"] {
+            assert_eq!(utc_to_timestamp(timestamp), None, "{timestamp}");
+            assert!(rfc3339_to_timestamp(timestamp).is_some(), "{timestamp}");
+            assert_eq!(rfc3339_to_timestamp(timestamp), chrono_timestamp(timestamp));
+        }
+    }
+
+    #[test]
+    fn rejects_malformed_timestamps() {
+        for timestamp in [
+            "2022-05-01T20:15:00.Z",
+            "2022-13-01T20:15:00Z",
+            "2022-0a-01T20:15:00Z",
+            "2022-05-01T2x:15:00Z",
+            "2022-+5-01T20:15:00Z",
+        ] {
+            assert_eq!(rfc3339_to_timestamp(timestamp), None, "{timestamp}");
+        }
+    }
+}